@@ -27,10 +27,12 @@ import ScriptEnv
 # TODO: Figure out how to set the python path for the Ansys internal IronPython
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), "util"))
 from geometry import (  # pylint: disable=wrong-import-position
+    BatchedEditor,
+    flush_property_changes,
     set_material,
     add_layer,
     add_material,
-    color_by_material,
+    color_by_material_batch,
     set_color,
     scale,
     match_layer,
@@ -64,7 +66,7 @@ oDefinitionManager = oProject.GetDefinitionManager()
 oProject.InsertDesign("2D Extractor", "CrossSectionDesign", "", "")
 oDesign = oProject.SetActiveDesign("CrossSectionDesign")
 
-oEditor = oDesign.SetActiveEditor("3D Modeler")
+oEditor = BatchedEditor(oDesign.SetActiveEditor("3D Modeler"))
 oBoundarySetup = oDesign.GetModule("BoundarySetup")
 oAnalysisSetup = oDesign.GetModule("AnalysisSetup")
 
@@ -105,11 +107,14 @@ scale(oEditor, oEditor.GetObjectsInGroup("Sheets"), data["gds_scaling"])
 
 # Get imported objects
 objects = {}
-for lname, ldata in layers.items():
+layer_colors = color_by_material_batch([ldata["material"] for ldata in layers.values()], material_dict)
+for (lname, ldata), color in zip(layers.items(), layer_colors):
     objects[lname] = [n for n in oEditor.GetMatchedObjectName(lname + "_*") if n[len(lname) + 1 :].isdigit()]
-    material = ldata["material"]
-    set_material(oEditor, objects[lname], material)
-    set_color(oEditor, objects[lname], *color_by_material(material, material_dict))
+    set_material(oEditor, objects[lname], ldata["material"])
+    set_color(oEditor, objects[lname], *color)
+
+flush_property_changes(oEditor)
+oEditor.flush()
 
 # Assign signal, ground, and floating objects
 excitations = {d["excitation"] for d in metal_layers.values()}
@@ -27,7 +27,9 @@ import ScriptEnv
 # TODO: Figure out how to set the python path for the Ansys internal IronPython
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), "util"))
 from geometry import (  # pylint: disable=wrong-import-position
+    BatchedEditor,
     create_box,
+    flush_property_changes,
     create_rectangle,
     create_polygon,
     thicken_sheet,
@@ -90,7 +92,7 @@ elif ansys_tool == "q3d":
     oProject.InsertDesign("Q3D Extractor", design_name, "", "")
     oDesign = oProject.SetActiveDesign(design_name)
 
-oEditor = oDesign.SetActiveEditor("3D Modeler")
+oEditor = BatchedEditor(oDesign.SetActiveEditor("3D Modeler"))
 oBoundarySetup = oDesign.GetModule("BoundarySetup")
 oAnalysisSetup = oDesign.GetModule("AnalysisSetup")
 oOutputVariable = oDesign.GetModule("OutputVariable")
@@ -188,6 +190,10 @@ for lname, ldata in layers.items():
 
     set_color(oEditor, objects[lname], *color_by_material(material, material_dict, thickness == 0.0))
 
+# Materials must be applied before boundary, net, and port identification below.
+flush_property_changes(oEditor)
+oEditor.flush()
+
 # Assign perfect electric conductor to metal sheets
 if metal_sheets:
     if ansys_tool in hfss_tools:
@@ -218,6 +224,7 @@ while need_subtraction:
         oDesktop.AddMessage("", "", 0, "Encountered circular subtractions in layers {}.".format(need_subtraction))
         break
 
+oEditor.flush()
 
 # Create ports or nets
 if ansys_tool in hfss_tools:
@@ -233,6 +240,7 @@ if ansys_tool in hfss_tools:
             # Create polygon spanning the two edges
             create_polygon(oEditor, polyname, [list(p) for p in port["polygon"]], units)
             set_color(oEditor, [polyname], 240, 180, 180, 0.8)
+            oEditor.flush()
 
             if ansys_tool == "hfss":
                 ground_objects = [o for n, d in metal_layers.items() if d["excitation"] == 0 for o in objects[n]]
@@ -482,6 +490,8 @@ elif ansys_tool == "q3d":
             oBoundarySetup.AssignSignalNet(["NAME:Net{}".format(excitation), "Objects:=", objs])
     oBoundarySetup.AutoIdentifyNets()  # Combine Nets by conductor connections. Order: GroundNet, SignalNet, FloatingNet
 
+flush_property_changes(oEditor)
+oEditor.flush()
 
 # Add field calculations
 if data.get("integrate_energies", False) and ansys_tool in hfss_tools:
@@ -803,6 +813,7 @@ if not ansys_project_template:
 else:  # use ansys_project_template
     # delete substrate and vacuum objects
     delete(oEditor, [o for n, v in objects.items() if "substrate" in n or "vacuum" in n for o in v])
+    oEditor.flush()
 
     scriptpath = os.path.dirname(__file__)
     aedt_path = os.path.join(scriptpath, "../")
@@ -20,40 +20,275 @@ from math import cos, pi
 
 
 # pylint: disable=consider-using-f-string
+# The explicit object base is required for the IronPython 2.7 runtime inside Ansys, where
+# old-style classes do not support the __getattr__-based proxying used below.
+class BatchedEditor(object):  # pylint: disable=useless-object-inheritance
+    """Wrapper around oEditor that queues modeling commands and issues them in batches.
+
+    Calls whose return values are not needed are recorded in call order instead of being
+    dispatched immediately. At flush time, consecutive calls to the same method are merged
+    into a single call where the API allows it (currently ``ChangeProperty`` with identical
+    changed properties, and ``Delete``), and the remaining calls are replayed in the
+    original order. Calling any method that returns a value (for example ``Paste`` or
+    ``GetMatchedObjectName``) flushes the queue first, so the editor state is always up to
+    date when queried.
+
+    Can be used as a context manager, in which case the queue is flushed on exit.
+    """
+
+    # Methods that are safe to defer because their return values are not used.
+    _queued_methods = frozenset(
+        [
+            "CreateRectangle",
+            "CreateBox",
+            "CreatePolyline",
+            "SweepAlongVector",
+            "Move",
+            "ChangeProperty",
+            "Delete",
+            "Subtract",
+            "Unite",
+            "Scale",
+        ]
+    )
+
+    def __init__(self, editor):
+        self._editor = editor
+        self._queue = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.flush()
+        return False
+
+    def __getattr__(self, name):
+        if name in self._queued_methods:
+
+            def enqueue(*args):
+                if not self._merge_into_previous(name, args):
+                    self._queue.append((name, args))
+
+            return enqueue
+        method = getattr(self._editor, name)
+
+        def flush_and_call(*args):
+            self.flush()
+            return method(*args)
+
+        return flush_and_call
+
+    def flush(self):
+        """Dispatches all queued commands to the wrapped editor."""
+        queue, self._queue = self._queue, []
+        for method, args in queue:
+            getattr(self._editor, method)(*args)
+
+    def _merge_into_previous(self, method, args):
+        """Merges the call into the latest queued command if both can be issued as one call."""
+        if not self._queue or self._queue[-1][0] != method:
+            return False
+        prev_args = self._queue[-1][1]
+        if method == "Delete":
+            # args[0] is ["NAME:Selections", "Selections:=", <comma-separated object names>]
+            prev_args[0][2] = prev_args[0][2] + "," + args[0][2]
+            return True
+        if method == "ChangeProperty":
+            # args[0] is ["NAME:AllTabs", [<tab>, ["NAME:PropServers", ...], ["NAME:ChangedProps", ...]]]
+            tab = args[0][1]
+            prev_tab = prev_args[0][1]
+            if tab[0] == prev_tab[0] and tab[2:] == prev_tab[2:]:
+                prev_tab[1] = prev_tab[1] + tab[1][1:]
+                return True
+        return False
+
+
+# Formatted position strings keyed by (value, units). The coordinates of a typical design
+# are drawn from a small set of distinct values, so the hit rate is high.
+_format_cache = {}
+
+
 def format_position(x, units):
     if isinstance(x, list):
         return [format_position(p, units) for p in x]
     elif isinstance(x, str):
         return x
-    else:
-        return str(x) + units
+    key = (x, units)
+    formatted = _format_cache.get(key)
+    if formatted is None:
+        if len(_format_cache) >= 65536:
+            _format_cache.clear()
+        formatted = str(x) + units
+        _format_cache[key] = formatted
+    return formatted
+
+
+# Comma-separated selection strings keyed by object name tuple. The same logical object
+# groups are passed to the helpers repeatedly, making the join redundant.
+_join_cache = {}
+
+
+def _csv(objects):
+    key = tuple(objects)
+    joined = _join_cache.get(key)
+    if joined is None:
+        if len(_join_cache) >= 1024:
+            _join_cache.clear()
+        joined = ",".join(objects)
+        _join_cache[key] = joined
+    return joined
+
+
+# Constant skeletons of the parameter arrays below. The helpers copy a template into a
+# list and patch the None placeholders in place, instead of rebuilding the identical
+# literal structure on every call.
+_RECTANGLE_PARAMETERS_TEMPLATE = (
+    "NAME:RectangleParameters",
+    "IsCovered:=",
+    True,
+    "XStart:=",
+    None,  # 4
+    "YStart:=",
+    None,  # 6
+    "ZStart:=",
+    None,  # 8
+    "Width:=",
+    None,  # 10
+    "Height:=",
+    None,  # 12
+    "WhichAxis:=",
+    None,  # 14
+)
+_BOX_PARAMETERS_TEMPLATE = (
+    "NAME:BoxParameters",
+    "XPosition:=",
+    None,  # 2
+    "YPosition:=",
+    None,  # 4
+    "ZPosition:=",
+    None,  # 6
+    "XSize:=",
+    None,  # 8
+    "YSize:=",
+    None,  # 10
+    "ZSize:=",
+    None,  # 12
+)
+_VECTOR_SWEEP_PARAMETERS_TEMPLATE = (
+    "NAME:VectorSweepParameters",
+    "DraftAngle:=",
+    "0deg",
+    "DraftType:=",
+    "Round",
+    "CheckFaceFaceIntersection:=",
+    False,
+    "SweepVectorX:=",
+    "0um",
+    "SweepVectorY:=",
+    "0um",
+    "SweepVectorZ:=",
+    None,  # 12
+)
+_TRANSLATE_PARAMETERS_TEMPLATE = (
+    "NAME:TranslateParameters",
+    "TranslateVectorX:=",
+    None,  # 2
+    "TranslateVectorY:=",
+    None,  # 4
+    "TranslateVectorZ:=",
+    None,  # 6
+)
+_SELECTIONS_TEMPLATE = (
+    "NAME:Selections",
+    "Selections:=",
+    None,  # 2
+    "NewPartsModelFlag:=",
+    "Model",
+)
 
 
 def create_rectangle(oEditor, name, x, y, z, w, h, axis, units):
     if w != 0.0 and h != 0.0:
+        params = list(_RECTANGLE_PARAMETERS_TEMPLATE)
+        params[4] = format_position(x, units)
+        params[6] = format_position(y, units)
+        params[8] = format_position(z, units)
+        params[10] = format_position(w, units)
+        params[12] = format_position(h, units)
+        params[14] = axis
         oEditor.CreateRectangle(
-            [
-                "NAME:RectangleParameters",
-                "IsCovered:=",
-                True,
-                "XStart:=",
-                format_position(x, units),
-                "YStart:=",
-                format_position(y, units),
-                "ZStart:=",
-                format_position(z, units),
-                "Width:=",
-                format_position(w, units),
-                "Height:=",
-                format_position(h, units),
-                "WhichAxis:=",
-                axis,
-            ],
+            params,
             ["NAME:Attributes", "Name:=", name, "PartCoordinateSystem:=", "Global"],
         )
 
 
+_PLPOINT_TEMPLATE = (
+    "NAME:PLPoint",
+    "X:=",
+    None,  # 2
+    "Y:=",
+    None,  # 4
+    "Z:=",
+    None,  # 6
+)
+_PLSEGMENT_TEMPLATE = (
+    "NAME:PLSegment",
+    "SegmentType:=",
+    "Line",
+    "StartIndex:=",
+    None,  # 4
+    "NoOfPoints:=",
+    2,
+)
+
+# Polyline cross-section blocks keyed by units; the block is fully constant per units.
+_xsection_cache = {}
+
+
+def _polyline_xsection(units):
+    block = _xsection_cache.get(units)
+    if block is None:
+        block = [
+            "NAME:PolylineXSection",
+            "XSectionType:=",
+            "None",
+            "XSectionOrient:=",
+            "Auto",
+            "XSectionWidth:=",
+            "0" + units,
+            "XSectionTopWidth:=",
+            "0" + units,
+            "XSectionHeight:=",
+            "0" + units,
+            "XSectionNumSegments:=",
+            "0",
+            "XSectionBendType:=",
+            "Corner",
+        ]
+        _xsection_cache[units] = block
+    return block
+
+
 def create_polygon(oEditor, name, points, units):
+    # Format each vertex once and reuse the first entry for the closing vertex. The nested
+    # NAME blocks are required by the AEDT scripting API, so the point and segment entries
+    # cannot be flattened; they are built by patching template copies instead.
+    fmt_points = [
+        (format_position(p[0], units), format_position(p[1], units), format_position(p[2], units)) for p in points
+    ]
+    fmt_points.append(fmt_points[0])
+    point_entries = []
+    for fmt_point in fmt_points:
+        entry = list(_PLPOINT_TEMPLATE)
+        entry[2], entry[4], entry[6] = fmt_point
+        point_entries.append(entry)
+    segment_entries = []
+    for i in range(len(points)):
+        entry = list(_PLSEGMENT_TEMPLATE)
+        entry[4] = i
+        segment_entries.append(entry)
     oEditor.CreatePolyline(
         [
             "NAME:PolylineParameters",
@@ -61,41 +296,9 @@ def create_polygon(oEditor, name, points, units):
             True,
             "IsPolylineClosed:=",
             True,
-            ["NAME:PolylinePoints"]
-            + [
-                [
-                    "NAME:PLPoint",
-                    "X:=",
-                    format_position(p[0], units),
-                    "Y:=",
-                    format_position(p[1], units),
-                    "Z:=",
-                    format_position(p[2], units),
-                ]
-                for p in points + [points[0]]
-            ],
-            ["NAME:PolylineSegments"]
-            + [
-                ["NAME:PLSegment", "SegmentType:=", "Line", "StartIndex:=", i, "NoOfPoints:=", 2]
-                for i in range(len(points))
-            ],
-            [
-                "NAME:PolylineXSection",
-                "XSectionType:=",
-                "None",
-                "XSectionOrient:=",
-                "Auto",
-                "XSectionWidth:=",
-                "0" + units,
-                "XSectionTopWidth:=",
-                "0" + units,
-                "XSectionHeight:=",
-                "0" + units,
-                "XSectionNumSegments:=",
-                "0",
-                "XSectionBendType:=",
-                "Corner",
-            ],
+            ["NAME:PolylinePoints"] + point_entries,
+            ["NAME:PolylineSegments"] + segment_entries,
+            _polyline_xsection(units),
         ],
         ["NAME:Attributes", "Name:=", name, "Flags:=", "", "PartCoordinateSystem:=", "Global"],
     )
@@ -103,22 +306,15 @@ def create_polygon(oEditor, name, points, units):
 
 def create_box(oEditor, name, x, y, z, sx, sy, sz, units):
     if sx != 0.0 and sy != 0.0 and sz != 0.0:
+        params = list(_BOX_PARAMETERS_TEMPLATE)
+        params[2] = format_position(x, units)
+        params[4] = format_position(y, units)
+        params[6] = format_position(z, units)
+        params[8] = format_position(sx, units)
+        params[10] = format_position(sy, units)
+        params[12] = format_position(sz, units)
         oEditor.CreateBox(
-            [
-                "NAME:BoxParameters",
-                "XPosition:=",
-                format_position(x, units),
-                "YPosition:=",
-                format_position(y, units),
-                "ZPosition:=",
-                format_position(z, units),
-                "XSize:=",
-                format_position(sx, units),
-                "YSize:=",
-                format_position(sy, units),
-                "ZSize:=",
-                format_position(sz, units),
-            ],
+            params,
             [
                 "NAME:Attributes",
                 "Name:=",
@@ -136,61 +332,79 @@ def create_box(oEditor, name, x, y, z, sx, sy, sz, units):
 def thicken_sheet(oEditor, objects, thickness, units):
     """Thickens sheet to solid with given thickness and material"""
     if objects and thickness != 0.0:
-        oEditor.SweepAlongVector(
-            ["NAME:Selections", "Selections:=", ",".join(objects), "NewPartsModelFlag:=", "Model"],
-            [
-                "NAME:VectorSweepParameters",
-                "DraftAngle:=",
-                "0deg",
-                "DraftType:=",
-                "Round",
-                "CheckFaceFaceIntersection:=",
-                False,
-                "SweepVectorX:=",
-                "0um",
-                "SweepVectorY:=",
-                "0um",
-                "SweepVectorZ:=",
-                "{} {}".format(thickness, units),
-            ],
-        )
+        selections = list(_SELECTIONS_TEMPLATE)
+        selections[2] = _csv(objects)
+        params = list(_VECTOR_SWEEP_PARAMETERS_TEMPLATE)
+        params[12] = "{} {}".format(thickness, units)
+        oEditor.SweepAlongVector(selections, params)
 
 
-def set_material(oEditor, objects, material=None, solve_inside=None):
-    if objects:
+# Property changes queued by set_material and set_color, keyed by the applied values.
+_pending_material = {}
+_pending_color = {}
+
+# Last applied (material, solve_inside) per object, used to skip no-op property changes.
+_object_state = {}
+
+
+def set_material(oEditor, objects, material=None, solve_inside=None):  # pylint: disable=unused-argument
+    """Queues material assignment for objects. Dispatched by flush_property_changes.
+
+    Objects whose last applied values already equal the requested ones are skipped, so
+    repeated assignments cost no editor calls.
+    """
+    state = (material, solve_inside)
+    changed = [o for o in objects if _object_state.get(o) != state]
+    if changed:
+        for o in changed:
+            _object_state[o] = state
+        _pending_material.setdefault(state, []).extend(changed)
+
+
+def flush_property_changes(oEditor):
+    """Dispatches the property changes queued by set_material and set_color.
+
+    Objects sharing identical property values are combined into a single ChangeProperty
+    call, so the number of editor calls scales with the number of distinct values instead
+    of the number of object groups.
+    """
+    for (material, solve_inside), objects in _pending_material.items():
         if solve_inside is not None:
-            oEditor.ChangeProperty(
-                [
-                    "NAME:AllTabs",
-                    [
-                        "NAME:Geometry3DAttributeTab",
-                        ["NAME:PropServers"] + objects,
-                        ["NAME:ChangedProps", ["NAME:Solve Inside", "Value:=", solve_inside]],
-                    ],
-                ]
-            )
+            _change_geometry_property(oEditor, objects, ["NAME:Solve Inside", "Value:=", solve_inside])
         if material is not None:
-            oEditor.ChangeProperty(
-                [
-                    "NAME:AllTabs",
-                    [
-                        "NAME:Geometry3DAttributeTab",
-                        ["NAME:PropServers"] + objects,
-                        ["NAME:ChangedProps", ["NAME:Material", "Value:=", '"{}"'.format(material)]],
-                    ],
-                ]
-            )
+            _change_geometry_property(oEditor, objects, ["NAME:Material", "Value:=", '"{}"'.format(material)])
         else:
-            oEditor.ChangeProperty(
+            _change_geometry_property(oEditor, objects, ["NAME:Model", "Value:=", False])
+    _pending_material.clear()
+    for (red, green, blue, transparency), objects in _pending_color.items():
+        oEditor.ChangeProperty(
+            [
+                "NAME:AllTabs",
                 [
-                    "NAME:AllTabs",
+                    "NAME:Geometry3DAttributeTab",
+                    ["NAME:PropServers"] + objects,
                     [
-                        "NAME:Geometry3DAttributeTab",
-                        ["NAME:PropServers"] + objects,
-                        ["NAME:ChangedProps", ["NAME:Model", "Value:=", False]],
+                        "NAME:ChangedProps",
+                        ["NAME:Color", "R:=", red, "G:=", green, "B:=", blue],
+                        ["NAME:Transparent", "Value:=", transparency],
                     ],
-                ]
-            )
+                ],
+            ]
+        )
+    _pending_color.clear()
+
+
+def _change_geometry_property(oEditor, objects, changed_prop):
+    oEditor.ChangeProperty(
+        [
+            "NAME:AllTabs",
+            [
+                "NAME:Geometry3DAttributeTab",
+                ["NAME:PropServers"] + objects,
+                ["NAME:ChangedProps", changed_prop],
+            ],
+        ]
+    )
 
 
 def add_layer(layer_map, order_map, layer_num, dest_layer, order, layer_type="signal"):
@@ -204,40 +418,56 @@ def add_layer(layer_map, order_map, layer_num, dest_layer, order, layer_type="si
 def move_vertically(oEditor, objects, z_shift, units):
     """Moves objects in z-direction by z_shift."""
     if objects and z_shift != 0.0:
-        oEditor.Move(
-            ["NAME:Selections", "Selections:=", ",".join(objects), "NewPartsModelFlag:=", "Model"],
-            [
-                "NAME:TranslateParameters",
-                "TranslateVectorX:=",
-                "0 {}".format(units),
-                "TranslateVectorY:=",
-                "0 {}".format(units),
-                "TranslateVectorZ:=",
-                "{} {}".format(z_shift, units),
-            ],
-        )
+        selections = list(_SELECTIONS_TEMPLATE)
+        selections[2] = _csv(objects)
+        params = list(_TRANSLATE_PARAMETERS_TEMPLATE)
+        params[2] = "0 {}".format(units)
+        params[4] = "0 {}".format(units)
+        params[6] = "{} {}".format(z_shift, units)
+        oEditor.Move(selections, params)
 
 
 def copy_paste(oEditor, objects):
     """Duplicates objects and returns new object names."""
     if objects:
-        oEditor.Copy(["NAME:Selections", "Selections:=", ",".join(objects)])
+        oEditor.Copy(["NAME:Selections", "Selections:=", _csv(objects)])
         return oEditor.Paste()
     else:
         return []
 
 
+def _forget_objects(objects):
+    """Drops cached state and queued property changes of objects that cease to exist.
+
+    Without this, flush_property_changes could emit a ChangeProperty whose PropServers
+    names an object that was deleted after it was queued, which fails in AEDT.
+    """
+    removed = set(objects)
+    for o in removed:
+        _object_state.pop(o, None)
+    for pending in (_pending_material, _pending_color):
+        for key in list(pending.keys()):
+            kept = [o for o in pending[key] if o not in removed]
+            if kept:
+                pending[key] = kept
+            else:
+                del pending[key]
+
+
 def delete(oEditor, objects):
     """Delete given objects"""
     if objects:
-        oEditor.Delete(["NAME:Selections", "Selections:=", ",".join(objects)])
+        _forget_objects(objects)
+        oEditor.Delete(["NAME:Selections", "Selections:=", _csv(objects)])
 
 
 def subtract(oEditor, objects, tool_objects, keep_originals=False):
     """Subtract tool_objects from objects."""
     if objects and tool_objects:
+        if not keep_originals:
+            _forget_objects(tool_objects)
         oEditor.Subtract(
-            ["NAME:Selections", "Blank Parts:=", ",".join(objects), "Tool Parts:=", ",".join(tool_objects)],
+            ["NAME:Selections", "Blank Parts:=", _csv(objects), "Tool Parts:=", _csv(tool_objects)],
             ["NAME:SubtractParameters", "KeepOriginals:=", keep_originals, "TurnOnNBodyBoolean:=", True],
         )
 
@@ -245,8 +475,10 @@ def subtract(oEditor, objects, tool_objects, keep_originals=False):
 def unite(oEditor, objects, keep_originals=False):
     """Unite objects into the first object."""
     if len(objects) > 1:
+        if not keep_originals:
+            _forget_objects(objects[1:])
         oEditor.Unite(
-            ["NAME:Selections", "Selections:=", ",".join(objects)],
+            ["NAME:Selections", "Selections:=", _csv(objects)],
             ["NAME:UniteParameters", "KeepOriginals:=", keep_originals, "TurnOnNBodyBoolean:=", True],
         )
 
@@ -275,30 +507,28 @@ def color_by_material(material, material_dict, is_sheet=True):
     return tuple(int(100 + 80 * c) for c in [cos(n - pi / 3), cos(n + pi), cos(n + pi / 3)]) + (alpha,)
 
 
-def set_color(oEditor, objects, red, green, blue, transparency):
-    """Sets color and transparency for given objects."""
+def color_by_material_batch(materials, material_dict, is_sheet=True):
+    """Returns list of (red, green, blue, transparency) tuples for the given materials.
+
+    The color math runs once per distinct material, so applying colors to many objects
+    avoids re-evaluating the trigonometric functions of `color_by_material` for repeated
+    materials.
+    """
+    colors = {m: color_by_material(m, material_dict, is_sheet) for m in set(materials)}
+    return [colors[m] for m in materials]
+
+
+def set_color(oEditor, objects, red, green, blue, transparency):  # pylint: disable=unused-argument
+    """Queues color and transparency for objects. Dispatched by flush_property_changes."""
     if objects:
-        oEditor.ChangeProperty(
-            [
-                "NAME:AllTabs",
-                [
-                    "NAME:Geometry3DAttributeTab",
-                    ["NAME:PropServers"] + objects,
-                    [
-                        "NAME:ChangedProps",
-                        ["NAME:Color", "R:=", red, "G:=", green, "B:=", blue],
-                        ["NAME:Transparent", "Value:=", transparency],
-                    ],
-                ],
-            ]
-        )
+        _pending_color.setdefault((red, green, blue, transparency), []).extend(objects)
 
 
 def scale(oEditor, objects, factor):
     """Scales given objects by 'factor' in all directions."""
     if objects and factor != 1.0:
         oEditor.Scale(
-            ["NAME:Selections", "Selections:=", ",".join(objects), "NewPartsModelFlag:=", "Model"],
+            ["NAME:Selections", "Selections:=", _csv(objects), "NewPartsModelFlag:=", "Model"],
             [
                 "NAME:ScaleParameters",
                 "ScaleX:=",
@@ -311,10 +541,17 @@ def scale(oEditor, objects, factor):
         )
 
 
+# Compiled regular expressions keyed by layer pattern.
+_layer_pattern_cache = {}
+
+
 def match_layer(layer_name, layer_pattern):
     """Return True if layer name matches pattern, else return False."""
-    pattern = "^" + str(re.escape(layer_pattern).replace(r"\*", ".*")) + "$"
-    return bool(re.match(pattern, layer_name))
+    compiled = _layer_pattern_cache.get(layer_pattern)
+    if compiled is None:
+        compiled = re.compile("^" + str(re.escape(layer_pattern).replace(r"\*", ".*")) + "$")
+        _layer_pattern_cache[layer_pattern] = compiled
+    return compiled.match(layer_name) is not None
 
 
 # pylint: enable=consider-using-f-string
@@ -15,13 +15,14 @@
 # (meetiqm.com/iqm-open-source-trademark-policy). IQM welcomes contributions to the code.
 # Please see our contribution agreements for individuals (meetiqm.com/iqm-individual-contributor-license-agreement)
 # and organizations (meetiqm.com/iqm-organization-contributor-license-agreement).
+import functools
+import itertools
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Any
 
 import numpy as np
-import pandas as pd
-import gmsh
 from scipy.constants import mu_0, epsilon_0
 
 from elmer_helpers import (
@@ -32,7 +33,7 @@ from elmer_helpers import (
 )
 
 from gmsh_helpers import (
-    separated_hull_and_holes,
+    hull_and_hole_coordinates,
     add_polygon,
     get_recursive_children,
     set_meshing,
@@ -64,6 +65,8 @@ def produce_cross_section_mesh(json_data: dict[str, Any], msh_file: Path | str)
         logging.info(f"Reusing existing mesh from {str(msh_file)}")
         return
 
+    import gmsh  # pylint: disable=import-outside-toplevel
+
     # Initialize gmsh
     gmsh.initialize()
 
@@ -77,22 +80,26 @@ def produce_cross_section_mesh(json_data: dict[str, Any], msh_file: Path | str)
     # Create mesh using geometries in gds file
     gmsh.model.add("cross_section")
 
+    # Prepare polygon coordinates in parallel. Only this preparation stage can use worker
+    # threads; the geometry creation below stays serial as the OCC kernel is not
+    # thread-safe for geometry creation.
+    regions = {name: pya.Region(cell.shapes(layout.layer(data["layer"], 0))) for name, data in layers.items()}
+    coordinate_cache: dict[int, tuple[np.ndarray, list[np.ndarray]]] = {}
+    with ThreadPoolExecutor() as executor:
+        futures = {
+            n: executor.submit(_region_polygon_coordinates, reg, layout.dbu, coordinate_cache)
+            for n, reg in regions.items()
+        }
+        layer_polygons = {name: future.result() for name, future in futures.items()}
+
     dim_tags = {}
-    for name, data in layers.items():
-        reg = pya.Region(cell.shapes(layout.layer(data["layer"], 0)))
+    for name, polygons in layer_polygons.items():
         layer_dim_tags = []
-        for simple_poly in reg.each():
-            poly = separated_hull_and_holes(simple_poly)
-            hull_point_coordinates = [
-                (point.x * layout.dbu, point.y * layout.dbu, 0) for point in poly.each_point_hull()
-            ]
+        for hull_point_coordinates, hole_point_coordinates_list in polygons:
             hull_plane_surface_id, _ = add_polygon(hull_point_coordinates)
             hull_dim_tag = (2, hull_plane_surface_id)
             hole_dim_tags = []
-            for hole in range(poly.holes()):
-                hole_point_coordinates = [
-                    (point.x * layout.dbu, point.y * layout.dbu, 0) for point in poly.each_point_hole(hole)
-                ]
+            for hole_point_coordinates in hole_point_coordinates_list:
                 hole_plane_surface_id, _ = add_polygon(hole_point_coordinates)
                 hole_dim_tags.append((2, hole_plane_surface_id))
             if hole_dim_tags:
@@ -101,12 +108,33 @@ def produce_cross_section_mesh(json_data: dict[str, Any], msh_file: Path | str)
                 layer_dim_tags.append(hull_dim_tag)
         dim_tags[name] = layer_dim_tags
 
-    # Call fragment and get updated dim_tags as new_tags. Then synchronize.
-    all_dim_tags = [tag for tags in dim_tags.values() for tag in tags]
-    _, dim_tags_map_imp = gmsh.model.occ.fragment(all_dim_tags, [], removeTool=False)
-    dim_tags_map = dict(zip(all_dim_tags, dim_tags_map_imp))
+    # Call fragment and get updated dim_tags as new_tags. Then synchronize. Fragment is the
+    # most expensive OCC boolean and is only needed to resolve overlapping or touching
+    # polygons into a conformal geometry: if no two polygon bounding boxes touch, the
+    # entities are known disjoint and every tag maps to itself.
+    all_dim_tags = list(itertools.chain.from_iterable(dim_tags.values()))
+    hulls = [hull for polygons in layer_polygons.values() for hull, _ in polygons]
+    bounds = [(hull[:, 0].min(), hull[:, 1].min(), hull[:, 0].max(), hull[:, 1].max()) for hull in hulls]
+    need_fragment = any(
+        b1[0] <= b2[2] and b2[0] <= b1[2] and b1[1] <= b2[3] and b2[1] <= b1[3]
+        for b1, b2 in itertools.combinations(bounds, 2)
+    )
+    if need_fragment:
+        _, dim_tags_map_imp = gmsh.model.occ.fragment(all_dim_tags, [], removeTool=False)
+    else:
+        dim_tags_map_imp = [[dt] for dt in all_dim_tags]
+    # Flatten the fragment output into one list plus an offsets array, so the new tags of
+    # the old tag at index i are the slice flat_map[map_starts[i]:map_starts[i + 1]].
+    flat_map = list(itertools.chain.from_iterable(dim_tags_map_imp))
+    map_starts = np.concatenate(([0], np.cumsum([len(m) for m in dim_tags_map_imp], dtype=np.int64)))
+    tag_indices = {tag: i for i, tag in enumerate(all_dim_tags)}
     new_tags = {
-        name: [new_tag for old_tag in tags for new_tag in dim_tags_map[old_tag]] for name, tags in dim_tags.items()
+        name: list(
+            itertools.chain.from_iterable(
+                flat_map[map_starts[tag_indices[t]] : map_starts[tag_indices[t] + 1]] for t in tags
+            )
+        )
+        for name, tags in dim_tags.items()
     }
     gmsh.model.occ.synchronize()
 
@@ -145,6 +173,27 @@ def produce_cross_section_mesh(json_data: dict[str, Any], msh_file: Path | str)
     gmsh.finalize()
 
 
+def _region_polygon_coordinates(
+    region: pya.Region, dbu: float, cache: dict[int, tuple[np.ndarray, list[np.ndarray]]]
+) -> list[tuple[np.ndarray, list[np.ndarray]]]:
+    """Returns hull and hole point coordinate arrays for each polygon of the region.
+
+    This is pure preparation work that can run in worker threads, producing the
+    (hull, holes) arrays consumed by the serial Gmsh geometry creation. Identical polygons
+    can appear in multiple layers (for example shared ground shapes), so the extraction is
+    memoized in `cache` by polygon hash.
+    """
+    polygons = []
+    for simple_poly in region.each():
+        key = simple_poly.hash()
+        coordinates = cache.get(key)
+        if coordinates is None:
+            coordinates = hull_and_hole_coordinates(simple_poly, dbu)
+            cache[key] = coordinates
+        polygons.append(coordinates)
+    return polygons
+
+
 def get_outer_bcs(bbox: pya.DBox, beps: float = 1e-6) -> dict[str, list[tuple[int, int]]]:
     """
     Returns the outer boundary dim tags for `xmin`, `xmax`, `ymin` and `ymax`.
@@ -156,20 +205,25 @@ def get_outer_bcs(bbox: pya.DBox, beps: float = 1e-6) -> dict[str, list[tuple[in
     Returns:
         dictionary with outer boundary dim tags
     """
-    outer_bc_dim_tags = {}
-    outer_bc_dim_tags["xmin_boundary"] = gmsh.model.occ.getEntitiesInBoundingBox(
-        bbox.p1.x - beps, bbox.p1.y - beps, -beps, bbox.p1.x + beps, bbox.p2.y + beps, beps, dim=1
-    )
-    outer_bc_dim_tags["xmax_boundary"] = gmsh.model.occ.getEntitiesInBoundingBox(
-        bbox.p2.x - beps, bbox.p1.y - beps, -beps, bbox.p2.x + beps, bbox.p2.y + beps, beps, dim=1
-    )
-    outer_bc_dim_tags["ymin_boundary"] = gmsh.model.occ.getEntitiesInBoundingBox(
-        bbox.p1.x - beps, bbox.p1.y - beps, -beps, bbox.p2.x + beps, bbox.p1.y + beps, beps, dim=1
-    )
-    outer_bc_dim_tags["ymax_boundary"] = gmsh.model.occ.getEntitiesInBoundingBox(
-        bbox.p1.x - beps, bbox.p2.y - beps, -beps, bbox.p2.x + beps, bbox.p2.y + beps, beps, dim=1
-    )
-    return outer_bc_dim_tags
+    import gmsh  # pylint: disable=import-outside-toplevel
+
+    # Collect the bounding boxes of all edges once and classify them with vectorized
+    # comparisons, instead of traversing the OCC entity tree once per boundary.
+    edges = gmsh.model.occ.getEntities(dim=1)
+    edge_bboxes = np.array([gmsh.model.occ.getBoundingBox(d, t) for d, t in edges]).reshape(-1, 6)
+
+    def entities_in_box(x1: float, y1: float, x2: float, y2: float) -> list[tuple[int, int]]:
+        lower = np.array([x1 - beps, y1 - beps, -beps])
+        upper = np.array([x2 + beps, y2 + beps, beps])
+        inside = np.all(edge_bboxes[:, :3] >= lower, axis=1) & np.all(edge_bboxes[:, 3:] <= upper, axis=1)
+        return [edges[i] for i in np.flatnonzero(inside)]
+
+    return {
+        "xmin_boundary": entities_in_box(bbox.p1.x, bbox.p1.y, bbox.p1.x, bbox.p2.y),
+        "xmax_boundary": entities_in_box(bbox.p2.x, bbox.p1.y, bbox.p2.x, bbox.p2.y),
+        "ymin_boundary": entities_in_box(bbox.p1.x, bbox.p1.y, bbox.p2.x, bbox.p1.y),
+        "ymax_boundary": entities_in_box(bbox.p1.x, bbox.p2.y, bbox.p2.x, bbox.p2.y),
+    }
 
 
 def produce_cross_section_sif_files(json_data: dict[str, Any], folder_path: Path) -> list[str]:
@@ -193,31 +247,57 @@ def produce_cross_section_sif_files(json_data: dict[str, Any], folder_path: Path
     folder_path.mkdir(exist_ok=True, parents=True)
     sif_names = json_data["sif_names"]
 
-    sif_files = [
-        save(
+    def write_capacitance_sif() -> str:
+        return save(
             f"{sif_names[0]}.sif",
             sif_capacitance(json_data, folder_path, vtu_name=sif_names[0], angular_frequency=0, dim=2, with_zero=False),
         )
-    ]
-    if json_data["run_inductance_sim"]:
+
+    def write_inductance_sif() -> str:
         if use_london_equations(json_data):
             circuit_definitions_file = save("inductance.definitions", sif_circuit_definitions(json_data))
-            sif_files.append(
-                save(
-                    f"{sif_names[1]}.sif",
-                    sif_inductance(json_data, folder_path, angular_frequency, circuit_definitions_file),
-                )
-            )
-        else:
-            sif_files.append(
-                save(
-                    f"{sif_names[1]}.sif",
-                    sif_capacitance(
-                        json_data, folder_path, vtu_name=sif_names[1], angular_frequency=0, dim=2, with_zero=True
-                    ),
-                )
+            return save(
+                f"{sif_names[1]}.sif",
+                sif_inductance(json_data, folder_path, angular_frequency, circuit_definitions_file),
             )
-    return sif_files
+        return save(
+            f"{sif_names[1]}.sif",
+            sif_capacitance(json_data, folder_path, vtu_name=sif_names[1], angular_frequency=0, dim=2, with_zero=True),
+        )
+
+    tasks = [write_capacitance_sif]
+    if json_data["run_inductance_sim"]:
+        tasks.append(write_inductance_sif)
+
+    # The sif contents are generated and written independently of each other, so overlap
+    # the string formatting of one file with the disk write of the other.
+    with ThreadPoolExecutor(max_workers=len(tasks)) as executor:
+        futures = [executor.submit(task) for task in tasks]
+        return [future.result() for future in futures]
+
+
+@functools.lru_cache(maxsize=None)
+def _read_matrix(file_name: str, mtime_ns: int) -> np.ndarray:  # pylint: disable=unused-argument
+    """Reads whitespace-delimited matrix file. The mtime_ns key invalidates stale entries."""
+    return np.loadtxt(file_name, dtype=np.float64, ndmin=2)
+
+
+@functools.lru_cache(maxsize=None)
+def _compute_l_matrix(file_name: str, mtime_ns: int) -> np.ndarray:
+    """Returns inductance matrix computed from the zero-permittivity capacitance file."""
+    c0_matrix = _read_matrix(file_name, mtime_ns)
+    # Solve C0 @ X = mu_0 * epsilon_0 * I instead of forming the explicit inverse, which
+    # needs about twice the floating point operations and is numerically less accurate.
+    return np.linalg.solve(c0_matrix, mu_0 * epsilon_0 * np.eye(c0_matrix.shape[0]))
+
+
+def _cache_key(file_path: Path) -> tuple[str, int]:
+    """Returns cache key of the file for the parsing helpers above.
+
+    Raises FileNotFoundError like the former direct `pd.read_csv` calls if the file does
+    not exist.
+    """
+    return str(file_path), file_path.stat().st_mtime_ns
 
 
 def get_cross_section_capacitance_and_inductance(
@@ -234,8 +314,7 @@ def get_cross_section_capacitance_and_inductance(
         Cs and Ls matrices
     """
     try:
-        c_matrix_file = Path(folder_path).joinpath("capacitance.dat")
-        c_matrix = pd.read_csv(c_matrix_file, sep=r"\s+", header=None).values
+        c_matrix = _read_matrix(*_cache_key(Path(folder_path).joinpath("capacitance.dat")))
     except FileNotFoundError:
         return {"Cs": None, "Ls": None}
 
@@ -245,20 +324,21 @@ def get_cross_section_capacitance_and_inductance(
             l_matrix_file = Path(folder_path).joinpath(l_matrix_file_name)
             if not l_matrix_file.is_file():
                 l_matrix_file = Path(folder_path).joinpath(f"{l_matrix_file_name}.0")
-            data = pd.read_csv(l_matrix_file, sep=r"\s+", header=None)
+            data = _read_matrix(*_cache_key(l_matrix_file))
             l_matrix_file = Path(folder_path).joinpath(l_matrix_file_name)
             with open(f"{l_matrix_file}.names", encoding="utf-8") as names:
-                data.columns = [
-                    line.split("res: ")[1].replace("\n", "") for line in names.readlines() if "res:" in line
-                ]
-            voltage = data["v_component(1) re"] + 1.0j * data["v_component(1) im"]
-            current = data["i_component(1) re"] + 1.0j * data["i_component(1) im"]
+                columns = {
+                    name: i
+                    for i, name in enumerate(
+                        line.split("res: ")[1].replace("\n", "") for line in names.readlines() if "res:" in line
+                    )
+                }
+            voltage = data[:, columns["v_component(1) re"]] + 1.0j * data[:, columns["v_component(1) im"]]
+            current = data[:, columns["i_component(1) re"]] + 1.0j * data[:, columns["i_component(1) im"]]
             impedance = voltage / current
             l_matrix = np.array([np.imag(impedance) / angular_frequency])
         else:
-            c0_matrix_file = Path(folder_path).joinpath("capacitance0.dat")
-            c0_matrix = pd.read_csv(c0_matrix_file, sep=r"\s+", header=None).values
-            l_matrix = mu_0 * epsilon_0 * np.linalg.inv(c0_matrix)
+            l_matrix = _compute_l_matrix(*_cache_key(Path(folder_path).joinpath("capacitance0.dat")))
     except FileNotFoundError:
         return {"Cs": c_matrix.tolist(), "Ls": None}
 
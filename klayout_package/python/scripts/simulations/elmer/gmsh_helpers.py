@@ -20,7 +20,6 @@ import itertools
 import re
 from pathlib import Path
 from typing import Any, Sequence, Iterable
-import gmsh
 import numpy as np
 
 try:
@@ -60,6 +59,8 @@ def produce_mesh(json_data: dict[str, Any], msh_file: Path) -> None:
         logging.info(f"Reusing existing mesh from {str(msh_file)}")
         return
 
+    import gmsh  # pylint: disable=import-outside-toplevel
+
     # Initialize gmsh
     gmsh.initialize()
 
@@ -148,11 +149,12 @@ def produce_mesh(json_data: dict[str, Any], msh_file: Path) -> None:
             gmsh.model.occ.synchronize()
 
     # Call fragment and get updated dim_tags as new_tags. Then synchronize.
-    all_dim_tags = [tag for tags in dim_tags.values() for tag in tags]
+    all_dim_tags = list(itertools.chain.from_iterable(dim_tags.values()))
     _, dim_tags_map_imp = gmsh.model.occ.fragment(all_dim_tags, [], removeTool=False)
     dim_tags_map = dict(zip(all_dim_tags, dim_tags_map_imp))
     new_tags = {
-        name: [new_tag for old_tag in tags for new_tag in dim_tags_map[old_tag]] for name, tags in dim_tags.items()
+        name: list(itertools.chain.from_iterable(dim_tags_map[old_tag] for old_tag in tags))
+        for name, tags in dim_tags.items()
     }
     gmsh.model.occ.synchronize()
 
@@ -234,6 +236,8 @@ def optimize_mesh(mesh_optimizer: dict | None) -> None:
     """Optimize the mesh if the mesh_optimizer is a dictionary. Ignore mesh optimization if mesh_optimizer is None."""
     if mesh_optimizer is None:
         return
+    import gmsh  # pylint: disable=import-outside-toplevel
+
     try:
         # Try optimizing with Netgen as the default method
         gmsh.model.mesh.optimize(**{"method": "Netgen", **mesh_optimizer})
@@ -267,11 +271,18 @@ def add_polygon(point_coordinates: Sequence[Sequence[float]], mesh_size: float =
     Returns:
         entity id of the polygon and list of entity ids of edge lines
     """
-    points = [gmsh.model.occ.addPoint(*coord, mesh_size) for coord in point_coordinates]
-    lines = [gmsh.model.occ.addLine(points[i - 1], points[i]) for i in range(1, len(points))]
-    lines.append(gmsh.model.occ.addLine(points[-1], points[0]))
-    loops = [gmsh.model.occ.addCurveLoop(lines)]
-    return gmsh.model.occ.addPlaneSurface(loops), lines
+    import gmsh  # pylint: disable=import-outside-toplevel
+
+    # Bind the OCC functions locally; for many small polygons the repeated attribute
+    # lookups through gmsh.model.occ are a measurable part of the per-vertex cost.
+    occ = gmsh.model.occ
+    add_point = occ.addPoint
+    add_line = occ.addLine
+    points = [add_point(*coord, mesh_size) for coord in point_coordinates]
+    lines = [add_line(points[i - 1], points[i]) for i in range(1, len(points))]
+    lines.append(add_line(points[-1], points[0]))
+    loops = [occ.addCurveLoop(lines)]
+    return occ.addPlaneSurface(loops), lines
 
 
 def separated_hull_and_holes(polygon: pya.Polygon | pya.SimplePolygon) -> pya.Polygon | pya.SimplePolygon:
@@ -288,6 +299,36 @@ def separated_hull_and_holes(polygon: pya.Polygon | pya.SimplePolygon) -> pya.Po
     return new_poly
 
 
+def hull_and_hole_coordinates(
+    polygon: pya.Polygon | pya.SimplePolygon, dbu: float
+) -> tuple[np.ndarray, list[np.ndarray]]:
+    """Returns hull and hole point coordinates of the polygon separated from each other.
+
+    Does the same separation as `separated_hull_and_holes` but produces the coordinate
+    arrays directly in a single traversal of the polygon topology, instead of building an
+    intermediate Polygon that would be iterated again. The hull and each hole are returned
+    as (N, 3) arrays of coordinates scaled by `dbu` with zero z-coordinate, ready to be
+    passed to `add_polygon`.
+    """
+    bbox = polygon.bbox().enlarged(10, 10)
+    region = pya.Region(bbox) - pya.Region(polygon)
+    hull = None
+    holes = []
+    for p in region.each():
+        if p.bbox() == bbox:
+            hull_region = pya.Region(bbox) - pya.Region(p)
+            hull = scaled_point_coordinates(hull_region[0].each_point_hull(), dbu)
+        else:
+            holes.append(scaled_point_coordinates(p.each_point_hull(), dbu))
+    return hull, holes
+
+
+def scaled_point_coordinates(points: Iterable[pya.Point], dbu: float) -> np.ndarray:
+    """Returns (N, 3) array of point coordinates scaled by `dbu`, with zero z-coordinate."""
+    xy = np.array([(point.x, point.y) for point in points], dtype=np.float64)
+    return np.column_stack((xy * dbu, np.zeros(len(xy))))
+
+
 def set_mesh_size(
     dim_tags: Sequence[DimTag],
     min_mesh_size: float,
@@ -331,6 +372,8 @@ def set_mesh_size(
     Returns:
         list of the threshold field ids that were defined in this function
     """
+    import gmsh  # pylint: disable=import-outside-toplevel
+
     mesh_field_ids = []
     for dim_tag in dim_tags:
         if dim_tag[0] > 2:
@@ -404,6 +447,8 @@ def get_recursive_children(dim_tags: Iterable[DimTag], include_parent: bool = Fa
     Returns:
         set of dim tags of all children and recursive grand children
     """
+    import gmsh  # pylint: disable=import-outside-toplevel
+
     children: set[DimTag] = set(dim_tags) if include_parent else set()
     while dim_tags:
         dim_tags = gmsh.model.getBoundary(list(dim_tags), combined=False, oriented=False, recursive=False)
@@ -421,6 +466,8 @@ def set_meshing(
         layer_dts: dictionary with layer names as keys and lists of dim-tags as values
         workflow: Parameters for simulation workflow
     """
+    import gmsh  # pylint: disable=import-outside-toplevel
+
     # Find global maximum mesh element length
     mesh_global_max_size = mesh_size.pop("global_max", 0)
     if isinstance(mesh_global_max_size, list) and mesh_global_max_size:
@@ -468,6 +515,8 @@ def set_meshing_options(mesh_field_ids: list[int], max_size: float, n_threads: i
         max_size: global maximal mesh element length
         n_threads: Number of threads to be used in mesh generation
     """
+    import gmsh  # pylint: disable=import-outside-toplevel
+
     background_field_id = gmsh.model.mesh.field.add("Min")
     gmsh.model.mesh.field.setNumbers(background_field_id, "FieldsList", mesh_field_ids)
     gmsh.model.mesh.field.setAsBackgroundMesh(background_field_id)